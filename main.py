@@ -1,5 +1,6 @@
 import sys
 import io # Add io for image data handling
+import base64
 import requests # Add requests for fetching tiles
 import requests_cache # Add requests_cache for caching
 from PyQt6.QtWidgets import (
@@ -8,16 +9,756 @@ from PyQt6.QtWidgets import (
     QPushButton, QTableView, QGroupBox, QComboBox, QDoubleSpinBox, QStatusBar,
     QLineEdit, QSpinBox # Add QLineEdit and QSpinBox
 )
-from PyQt6.QtCore import Qt, QPointF, QRectF, QSize # Add QRectF, QSize
-from PyQt6.QtGui import QPixmap, QPainter, QTransform, QImage # Add QImage
+from PyQt6.QtCore import (
+    Qt, QPointF, QRectF, QSize, QAbstractTableModel, QModelIndex, QTimer, # Add QRectF, QSize
+    QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+)
+from PyQt6.QtGui import QPixmap, QPainter, QTransform, QImage, QPainterPath # Add QImage
 import math # Add math for calculations
+from contextlib import closing
+from operator import itemgetter
+import re
+import logging
+import time
+import hashlib
+import queue
+import sqlite3
+import threading
+import asyncio
+import numpy as np
+from PIL import Image
+import scipy.ndimage
+import scipy.sparse
+import scipy.sparse.linalg
+from scipy.spatial import cKDTree
+from skimage.transform import PolynomialTransform
+try:
+    from numba import njit, prange
+except ImportError: # Numba is optional, TPS evaluation falls back to chunked NumPy
+    njit = None
+try:
+    import cupy
+except ImportError: # CuPy is optional, enables GPU evaluation of the TPS for the preview
+    cupy = None
+try:
+    import aiohttp
+except ImportError: # aiohttp is optional, enables downloading tiles on an asyncio event loop
+    aiohttp = None
+
+logger = logging.getLogger(__name__) # Silent unless the application configures logging
 
 # --- Constants ---
 TILE_SIZE = 256 # Standard size for web map tiles
+# Formats the raster paint engine draws directly; other decoded tiles are converted once
+NATIVE_TILE_FORMATS = (QImage.Format.Format_RGB32, QImage.Format.Format_ARGB32_Premultiplied)
+TILE_FETCH_THREADS = 8 # Concurrent tile downloads; more tends to get throttled by tile providers
+TILE_RETRY_DELAY = 2.0 # Seconds before a failed tile is requested again, doubled per consecutive failure
+TILE_RETRY_MAX_DELAY = 120.0
+TILE_REQUEST_TIMEOUT = 10 # Seconds (connect and read), so a stalled server cannot hold a pool thread
+TILE_BATCH_MAX = 16 # Tiles per request when a batch endpoint is configured
+TILE_PREFETCH_THREADS = 2 # Separate lane for tiles just outside the view, so they never delay visible ones
+TILE_ASYNC_CONNECTIONS = 32 # Open connections of the aiohttp session, see _AsyncTileFetcher
+TILE_ASYNC_CONNECTIONS_PER_HOST = 8 # Same per-server limit as TILE_FETCH_THREADS
+SPARSE_RBF_THRESHOLD = 500 # Above this many GCPs "Thin Plate Spline" switches to a compactly supported RBF
+# Scanned map sheets routinely exceed Pillow's ~89 Mpx decompression bomb default. Pillow warns above this
+# limit and refuses above twice it (~1 Gpx, 4 GB as RGBA); refused loads are reported like unreadable files
+IMAGE_MAX_PIXELS = 1 << 29
+Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
+TILE_CACHE_NAME = 'tile_cache' # SQLite file (tile_cache.sqlite) holding cached tile responses
+
+def create_tile_session(expire_after=86400):
+    """Creates the cached HTTP session for tiles; cache expires after 1 day by default, can be configured."""
+    # WAL lets pool threads read while another inserts, and with it requests_cache drops to
+    # synchronous=NORMAL, so a cache write no longer waits on an fsync
+    backend = requests_cache.SQLiteCache(TILE_CACHE_NAME, wal=True)
+    return requests_cache.CachedSession(backend=backend, expire_after=expire_after)
+
+# --- Coordinate Helpers ---
+def lonlat_to_world_pixels(lon, lat, zoom):
+    """Projects lon/lat degrees (scalars or arrays) to Web Mercator world pixels at a given zoom."""
+    map_size = TILE_SIZE * (2 ** zoom)
+    lat = np.clip(lat, -85.05112878, 85.05112878) # Web Mercator latitude limits
+    x = (np.asarray(lon) + 180.0) / 360.0 * map_size
+    y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / np.pi) / 2.0 * map_size
+    return x, y
+
+def compile_tile_url(url_template):
+    """Turns an XYZ template into a fast builder (z, x, y) -> URL.
+
+    The placeholders are rewritten once into a positional %-format string, so building a URL
+    per tile is a single % instead of str.format parsing the template and its keyword arguments.
+    """
+    order = [] # Index into (z, x, y) of each placeholder, in template order
+    def placeholder(match):
+        order.append('zxy'.index(match.group(1)))
+        return '%d'
+    fmt = re.sub(r'\{([zxy])\}', placeholder, url_template.replace('%', '%%'))
+    pick = itemgetter(*order) # Callers ensure all three placeholders are present, so this returns a tuple
+    return lambda z, x, y: fmt % pick((z, x, y))
+
+
+# --- Image Helpers ---
+def array_to_qimage(array):
+    """Wraps an (H, W) grayscale or (H, W, 4) RGBA uint8 array in a QImage without copying.
+
+    The QImage reads the array's buffer directly, so the caller must keep the array alive.
+    """
+    h, w = array.shape[:2]
+    image_format = QImage.Format.Format_Grayscale8 if array.ndim == 2 else QImage.Format.Format_RGBA8888
+    return QImage(array.data, w, h, array.strides[0], image_format)
+
+def image_to_array(image):
+    """Decodes a PIL image into an (H, W) grayscale or (H, W, 4) RGBA uint8 array for array_to_qimage.
+
+    Single-band images stay 1 byte per pixel. Wider single-band rasters (16-bit scans, 32-bit or
+    float DEMs) are scaled down to 8 bits, which convert('RGBA') would clip instead: 16-bit
+    keeps its high byte, like QImage's Grayscale16 display, the others are stretched min to max.
+    """
+    if image.mode == 'L':
+        return np.asarray(image)
+    if image.mode.startswith('I;16'):
+        return (np.asarray(image) >> 8).astype(np.uint8)
+    if image.mode in ('I', 'F'):
+        values = np.asarray(image, dtype=np.float32)
+        finite = np.isfinite(values)
+        if not finite.any():
+            return np.zeros(values.shape, np.uint8)
+        lo, hi = values[finite].min(), values[finite].max()
+        scaled = (values - lo) * np.float32(255 / (hi - lo) if hi > lo else 0)
+        return np.nan_to_num(scaled, nan=0, posinf=255, neginf=0).astype(np.uint8) # NaN nodata as black
+    return np.asarray(image.convert('RGBA'))
+
+# --- Transformations ---
+def tps_kernel(d2):
+    """Thin Plate Spline basis U(r) = r^2 log r, evaluated from squared distances."""
+    # r^2 log r == 0.5 * r^2 log r^2, so no sqrt is needed; U(0) is defined as 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(d2 > 0, 0.5 * d2 * np.log(d2), 0.0)
+
+TPS_EVAL_CHUNK = 65536 # Points per block in the NumPy fallback, bounds the (points x control points) matrix
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def tps_apply(xs, ys, src_x, src_y, wx, wy, ax, ay):
+        """Evaluates a fitted TPS at the points (xs, ys), compiled and parallelized across points."""
+        n = xs.shape[0]
+        out_x = np.empty(n)
+        out_y = np.empty(n)
+        for i in prange(n):
+            x = xs[i]
+            y = ys[i]
+            fx = ax[0] + ax[1] * x + ax[2] * y
+            fy = ay[0] + ay[1] * x + ay[2] * y
+            for j in range(src_x.shape[0]):
+                dx = x - src_x[j]
+                dy = y - src_y[j]
+                r2 = dx * dx + dy * dy
+                u = 0.5 * r2 * np.log(r2 + 1e-12) # r^2 log r, ~0 at r = 0
+                fx += wx[j] * u
+                fy += wy[j] * u
+            out_x[i] = fx
+            out_y[i] = fy
+        return out_x, out_y
+else:
+    def tps_apply(xs, ys, src_x, src_y, wx, wy, ax, ay):
+        """Evaluates a fitted TPS at the points (xs, ys) in blocks of vectorized NumPy."""
+        src = np.column_stack([src_x, src_y])
+        weights = np.column_stack([wx, wy])
+        out_x = np.empty(len(xs))
+        out_y = np.empty(len(xs))
+        for start in range(0, len(xs), TPS_EVAL_CHUNK):
+            bx = xs[start:start + TPS_EVAL_CHUNK]
+            by = ys[start:start + TPS_EVAL_CHUNK]
+            d2 = (bx[:, None] - src[None, :, 0]) ** 2 + (by[:, None] - src[None, :, 1]) ** 2
+            u = tps_kernel(d2) @ weights
+            out_x[start:start + len(bx)] = ax[0] + ax[1] * bx + ax[2] * by + u[:, 0]
+            out_y[start:start + len(bx)] = ay[0] + ay[1] * bx + ay[2] * by + u[:, 1]
+        return out_x, out_y
+
+TPS_GPU_BLOCK_BYTES = 1 << 28 # Size of the (points x control points) block evaluated per GPU pass
+
+def tps_apply_gpu(xs, ys, src_x, src_y, wx, wy, ax, ay):
+    """Evaluates a fitted TPS at the points (xs, ys) on the GPU with CuPy; same signature as tps_apply."""
+    src_x, src_y, wx, wy = (cupy.asarray(a) for a in (src_x, src_y, wx, wy))
+    chunk = max(1024, TPS_GPU_BLOCK_BYTES // (8 * len(src_x)))
+    out_x = np.empty(len(xs))
+    out_y = np.empty(len(xs))
+    for start in range(0, len(xs), chunk):
+        bx = cupy.asarray(xs[start:start + chunk])
+        by = cupy.asarray(ys[start:start + chunk])
+        r2 = (bx[:, None] - src_x[None, :]) ** 2 + (by[:, None] - src_y[None, :]) ** 2
+        u = 0.5 * r2 * cupy.log(r2 + 1e-12) # r^2 log r, ~0 at r = 0
+        out_x[start:start + len(bx)] = cupy.asnumpy(ax[0] + ax[1] * bx + ax[2] * by + u @ wx)
+        out_y[start:start + len(bx)] = cupy.asnumpy(ay[0] + ay[1] * bx + ay[2] * by + u @ wy)
+    return out_x, out_y
+
+class ThinPlateSplineTransform:
+    """Thin Plate Spline fitted to control points, with the same estimate()/call API as skimage transforms."""
+    LINV_CACHE_SIZE = 4 # Control point layouts whose L^-1 is kept, most recently used last
+    UPDATE_TOLERANCE = 1e-9 # Max relative residual of a fit through an incrementally updated L^-1
+    SOLVE_TOLERANCE = 1e-6 # Same for a full inverse; above it the system is singular in all but name
 
-# Setup caching (configure as needed, e.g., cache name, backend)
-# Cache expires after 1 day by default, can be configured
-requests_cache.install_cache('tile_cache', backend='sqlite', expire_after=86400) # Default 1 day expiry
+    def __init__(self):
+        self.use_gpu = False # Evaluate with tps_apply_gpu (requires CuPy)
+        self.src = None # Control points, shape (N, 2)
+        self.coeffs = None # Kernel weights (N rows) followed by the affine terms (3 rows), shape (N+3, 2)
+        # The spline is fitted in normalized coordinates (src - center) / scale, which keeps L well
+        # conditioned; a TPS is invariant to this similarity, it is absorbed by the affine terms
+        self._center, self._scale = np.zeros(2), 1.0
+        # (L^-1, center, scale) keyed by the control points' bytes: L depends only on src, so edits that
+        # only move the targets (or return to a previous layout) cost one O(N^2) product instead of a solve
+        self._Linv_cache = {}
+
+    def estimate(self, src, dst):
+        """Fits the spline so that src maps onto dst. Returns False if the system cannot be solved."""
+        src = np.array(src, dtype=np.float64) # Copy, callers may pass views into mutable GCP storage
+        dst = np.asarray(dst, dtype=np.float64)
+        n = len(src)
+        if n < 3:
+            return False
+
+        V = np.zeros((n + 3, 2))
+        V[:n] = dst
+        key = src.tobytes()
+        entry = self._Linv_cache.pop(key, None) # Re-inserted below as most recently used
+        if entry is None and n > 3:
+            # A GCP appended to a cached layout only borders L with one row and column,
+            # so L^-1 can be updated in O(N^2) instead of inverted again in O(N^3)
+            previous = self._Linv_cache.get(src[:-1].tobytes())
+            if previous is not None:
+                Linv, center, scale = previous
+                normalized = (src - center) / scale
+                Linv = self._bordered_inverse(Linv, normalized)
+                # Rounding error builds up over many updates; check the solve and refactor if it drifted
+                if Linv is not None and self._residual(normalized, Linv, V) <= self.UPDATE_TOLERANCE:
+                    entry = (Linv, center, scale)
+        if entry is None:
+            center = src.mean(axis=0)
+            scale = np.ptp(src, axis=0).max() or 1.0
+            normalized = (src - center) / scale
+            # Collinear points leave the affine part undetermined; inv() rarely notices in floating point
+            if np.linalg.matrix_rank(np.column_stack([np.ones(n), normalized])) < 3:
+                logger.error("TPS affine part is degenerate (collinear GCPs?)")
+                self.src = self.coeffs = None
+                return False
+            try:
+                Linv = np.linalg.inv(self._system_matrix(normalized))
+            except np.linalg.LinAlgError:
+                Linv = None
+            if Linv is None or not self._residual(normalized, Linv, V) <= self.SOLVE_TOLERANCE:
+                logger.error("TPS system is singular (duplicate GCPs?)")
+                self.src = self.coeffs = None
+                return False
+            entry = (Linv, center, scale)
+        if len(self._Linv_cache) >= self.LINV_CACHE_SIZE:
+            self._Linv_cache.pop(next(iter(self._Linv_cache))) # Evict least recently used
+        self._Linv_cache[key] = entry
+
+        Linv, self._center, self._scale = entry
+        self.src = src
+        self.coeffs = Linv @ V
+        return True
+
+    @classmethod
+    def _residual(cls, src, Linv, V):
+        """Max residual of the fit through Linv, relative to the targets (NaN if Linv is not finite)."""
+        return np.abs(cls._system_matrix(src) @ (Linv @ V) - V).max() / max(1.0, np.abs(V).max())
+
+    @staticmethod
+    def _bordered_inverse(Linv, src):
+        """Updates L^-1 of src[:-1] to L^-1 of src, or returns None if the update is ill-conditioned."""
+        m = len(src) - 1
+        new = src[-1]
+        # New row/column of L: kernel values against the old points, then the affine terms [1, x, y]
+        b = np.concatenate([tps_kernel(((src[:m] - new) ** 2).sum(-1)), [1.0, new[0], new[1]]])
+        z = Linv @ b
+        c = 0.0 - b @ z # Schur complement of the new diagonal entry, U(0) = 0
+        if not np.isfinite(c) or abs(c) < 1e-12:
+            return None # e.g. a duplicate point, let the full inverse report it
+        bordered = np.empty((m + 4, m + 4))
+        bordered[:-1, :-1] = Linv + np.outer(z, z) / c
+        bordered[:-1, -1] = bordered[-1, :-1] = -z / c
+        bordered[-1, -1] = 1.0 / c
+        # The border was appended after the affine rows; move it in front of them
+        order = np.r_[0:m, m + 3, m:m + 3]
+        return bordered[np.ix_(order, order)]
+
+    @staticmethod
+    def _system_matrix(src):
+        """Builds the bordered TPS matrix L = [[K, P], [P^T, 0]] for the control points."""
+        n = len(src)
+        # The whole kernel matrix K in one vectorized pass over all point pairs
+        d2 = ((src[:, None, :] - src[None, :, :]) ** 2).sum(-1)
+        P = np.hstack([np.ones((n, 1)), src])
+        L = np.zeros((n + 3, n + 3))
+        L[:n, :n] = tps_kernel(d2)
+        L[:n, n:] = P
+        L[n:, :n] = P.T
+        return L
+
+    def __call__(self, coords):
+        """Maps an (M, 2) array of coordinates through the spline."""
+        coords = (np.asarray(coords, dtype=np.float64) - self._center) / self._scale
+        src = (self.src - self._center) / self._scale
+        n = len(src)
+        weights, affine = self.coeffs[:n], self.coeffs[n:]
+        apply = tps_apply_gpu if self.use_gpu and cupy is not None else tps_apply
+        out_x, out_y = apply(
+            np.ascontiguousarray(coords[:, 0]), np.ascontiguousarray(coords[:, 1]),
+            np.ascontiguousarray(src[:, 0]), np.ascontiguousarray(src[:, 1]),
+            np.ascontiguousarray(weights[:, 0]), np.ascontiguousarray(weights[:, 1]),
+            np.ascontiguousarray(affine[:, 0]), np.ascontiguousarray(affine[:, 1]),
+        )
+        return np.column_stack([out_x, out_y])
+
+def wendland_kernel(r):
+    """Wendland C2 function (1 - r)^4 (4r + 1), zero for r >= 1 (r is distance / support radius)."""
+    t = np.clip(1.0 - r, 0.0, None)
+    return t ** 4 * (4.0 * r + 1.0)
+
+class WendlandRBFTransform:
+    """Affine fit plus a compactly supported RBF correction, for GCP counts where a dense TPS is too slow.
+
+    Each basis function only reaches neighbours within the support radius, so the kernel matrix
+    is sparse (and positive definite) and is solved with conjugate gradients.
+    """
+    EVAL_CHUNK = 65536 # Points per block when evaluating, bounds the neighbour pair arrays
+
+    def __init__(self, support=0.05):
+        self.support = support # Support radius as a fraction of the control points' bounding box diagonal
+        self.src = None # Control points, shape (N, 2)
+        self.affine = None # Affine terms, shape (3, 2)
+        self.weights = None # RBF weights, shape (N, 2)
+        self.radius = None # Support radius in source units
+        self._tree = None # KD-tree over src for neighbour queries
+
+    def estimate(self, src, dst):
+        """Fits the transform so that src maps onto dst. Returns False if the system cannot be solved."""
+        src = np.array(src, dtype=np.float64)
+        dst = np.asarray(dst, dtype=np.float64)
+        n = len(src)
+        if n < 3:
+            return False
+
+        # Affine part by least squares; the RBF then interpolates what is left
+        P = np.hstack([np.ones((n, 1)), src])
+        affine, _, rank, _ = np.linalg.lstsq(P, dst, rcond=None)
+        if rank < 3:
+            logger.error("RBF affine part is degenerate (collinear GCPs?)")
+            return False
+        residual = dst - P @ affine
+
+        radius = self.support * np.hypot(*np.ptp(src, axis=0))
+        tree = cKDTree(src)
+        # Sparse symmetric kernel matrix from the point pairs within the support radius
+        i, j = tree.query_pairs(radius, output_type='ndarray').T
+        values = wendland_kernel(np.linalg.norm(src[i] - src[j], axis=1) / radius)
+        diagonal = np.arange(n)
+        K = scipy.sparse.csr_matrix(
+            (np.concatenate([values, values, np.ones(n)]),
+             (np.concatenate([i, j, diagonal]), np.concatenate([j, i, diagonal]))),
+            shape=(n, n))
+
+        weights = np.empty((n, 2))
+        for axis in range(2):
+            weights[:, axis], info = scipy.sparse.linalg.cg(K, residual[:, axis], rtol=1e-8, maxiter=10 * n)
+            if info != 0:
+                logger.error("RBF solve did not converge (info=%s)", info)
+                return False
+        self.src, self.affine, self.weights, self.radius, self._tree = src, affine, weights, radius, tree
+        return True
+
+    def __call__(self, coords):
+        """Maps an (M, 2) array of coordinates through the transform."""
+        coords = np.asarray(coords, dtype=np.float64)
+        out = self.affine[0] + coords @ self.affine[1:]
+        for start in range(0, len(coords), self.EVAL_CHUNK):
+            block = coords[start:start + self.EVAL_CHUNK]
+            pairs = cKDTree(block).sparse_distance_matrix(self._tree, self.radius, output_type='ndarray')
+            phi = wendland_kernel(pairs['v'] / self.radius)
+            for axis in range(2):
+                out[start:start + len(block), axis] += np.bincount(
+                    pairs['i'], weights=phi * self.weights[pairs['j'], axis], minlength=len(block))
+        return out
+
+# --- Tile Loading ---
+class _TileLRU:
+    """Tiles keyed by (z, x, y), evicting the least recently used beyond capacity.
+
+    Keys are kept as structure-of-arrays slots (z, x, y and a last-use stamp per slot), so the
+    tiles inside a view rectangle are found with one vectorized mask instead of one dict lookup
+    per grid cell. The pixels live in a single atlas pixmap, one TILE_SIZE cell per slot, so a
+    whole view is drawn with one drawPixmapFragments call. GUI thread only (QPixmap).
+    """
+    ATLAS_COLUMNS = 16 # Cells per atlas row
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.atlas = None # QPixmap, created and grown (never shrunk) as slots are allocated
+        self._reset()
+
+    def _reset(self):
+        self._index = {} # (z, x, y) -> slot
+        self._slots = 0 # Slots ever allocated, in use or free
+        self._free = [] # Released slots, reused before new ones are allocated
+        self._z = np.zeros(0, np.int32)
+        self._x = np.zeros(0, np.int32)
+        self._y = np.zeros(0, np.int32)
+        self._stamp = np.zeros(0, np.int64) # Last use per slot, -1 for a free slot
+        self._clock = 0
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def cell(self, slot):
+        """Atlas rectangle holding the slot's tile."""
+        return QRectF((slot % self.ATLAS_COLUMNS) * TILE_SIZE, (slot // self.ATLAS_COLUMNS) * TILE_SIZE,
+                      TILE_SIZE, TILE_SIZE)
+
+    def slot(self, key):
+        """Returns the atlas slot holding the tile or None, marking it as recently used."""
+        slot = self._index.get(key)
+        if slot is not None:
+            self._stamp[slot] = self._tick()
+        return slot
+
+    def put(self, key, image: QImage):
+        slot = self._index.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = self._slots
+                self._slots += 1
+                if slot == len(self._stamp): # Grow the arrays geometrically
+                    grow = max(16, slot)
+                    self._z, self._x, self._y = (np.concatenate([a, np.zeros(grow, np.int32)])
+                                                 for a in (self._z, self._x, self._y))
+                    self._stamp = np.concatenate([self._stamp, np.full(grow, -1, np.int64)])
+                self._ensure_atlas(slot)
+            self._index[key] = slot
+            self._z[slot], self._x[slot], self._y[slot] = key
+        painter = QPainter(self.atlas)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source) # Replace the old cell
+        painter.drawImage(self.cell(slot), image)
+        painter.end()
+        self._stamp[slot] = self._tick()
+        self.trim()
+
+    def _ensure_atlas(self, slot):
+        """Grows the atlas so it has a cell for the slot, with room for the whole capacity."""
+        rows = math.ceil((max(slot, self.capacity) + 1) / self.ATLAS_COLUMNS)
+        if self.atlas is not None and self.atlas.height() >= rows * TILE_SIZE:
+            return
+        atlas = QPixmap(self.ATLAS_COLUMNS * TILE_SIZE, rows * TILE_SIZE)
+        atlas.fill(Qt.GlobalColor.transparent)
+        if self.atlas is not None:
+            painter = QPainter(atlas)
+            painter.drawPixmap(0, 0, self.atlas)
+            painter.end()
+        self.atlas = atlas
+
+    def visible(self, z, min_x, max_x, min_y, max_y):
+        """Returns (xs, ys, slots) of the loaded tiles inside the range, marking them as recently used."""
+        slots = np.flatnonzero(
+            (self._z == z) & (self._x >= min_x) & (self._x <= max_x)
+            & (self._y >= min_y) & (self._y <= max_y) & (self._stamp >= 0))
+        self._stamp[slots] = self._tick() # Visible tiles are the last to be evicted
+        return self._x[slots], self._y[slots], slots
+
+    def trim(self):
+        """Evicts least recently used tiles until at most capacity remain."""
+        excess = len(self._index) - self.capacity
+        if excess > 0:
+            used = np.flatnonzero(self._stamp >= 0)
+            for slot in used[np.argsort(self._stamp[used])[:excess]].tolist():
+                del self._index[(int(self._z[slot]), int(self._x[slot]), int(self._y[slot]))]
+                self._stamp[slot] = -1
+                self._free.append(slot)
+
+    def clear(self):
+        self._reset() # Keeps the atlas; its cells are overwritten as slots are reused
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class _MBTilesCache:
+    """Persistent tile store in an MBTiles (SQLite) file, independent of the HTTP cache.
+
+    Holds only the encoded tile bytes, so a warm start or offline session decodes straight from
+    disk. Lookups run on the tile pool threads (one connection each); inserts are queued to a
+    writer thread that commits whatever has accumulated in a single transaction.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local() # Per-thread read connection
+        self._readers = [] # Every read connection, closed by close() (pool threads outlive the store)
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self._queue = queue.Queue() # Rows to insert, None stops the writer
+        with closing(self._connect()) as conn: # Autocommit, so closing is all the context has to do
+            conn.execute("""CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                fetched_at REAL, PRIMARY KEY (zoom_level, tile_column, tile_row))""")
+            conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+        self._writer = threading.Thread(target=self._write_loop, name="mbtiles-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL") # Readers never wait for the writer thread
+        conn.execute("PRAGMA synchronous=NORMAL") # No fsync per commit, WAL stays consistent
+        return conn
+
+    def get(self, z, x, y, max_age=None):
+        """Returns the stored tile bytes, or None if missing or older than max_age seconds."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            with self._readers_lock:
+                if self._closed:
+                    conn.close()
+                    return None
+                self._readers.append(conn)
+            self._local.conn = conn
+        try:
+            row = conn.execute(
+                "SELECT tile_data, fetched_at FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, (1 << z) - 1 - y)).fetchone() # MBTiles rows count from the bottom (TMS)
+        except sqlite3.Error as e:
+            if not self._closed: # Reads racing close() just miss
+                logger.warning("MBTiles read failed for %s/%s/%s: %s", z, x, y, e)
+            return None
+        if row is None or (max_age is not None and time.time() - (row[1] or 0) > max_age):
+            return None
+        return row[0]
+
+    def put(self, z, x, y, data):
+        """Queues the tile bytes for insertion; returns immediately."""
+        self._queue.put((z, x, (1 << z) - 1 - y, data, time.time()))
+
+    def close(self):
+        """Writes out queued tiles, stops the writer thread and closes all connections."""
+        self._queue.put(None)
+        self._writer.join()
+        with self._readers_lock:
+            self._closed = True
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            while True: # Drain everything queued meanwhile into the same transaction
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            if rows:
+                try:
+                    conn.execute("BEGIN")
+                    conn.executemany("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?)", rows)
+                    conn.execute("COMMIT")
+                except sqlite3.Error as e:
+                    logger.warning("MBTiles write of %d tiles failed: %s", len(rows), e)
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+            if stop:
+                conn.close()
+                return
+
+
+class TileSignals(QObject):
+    """Carries results of TileJob workers back to the GUI thread (queued across threads)."""
+    tileReady = pyqtSignal(int, int, int, int, QImage) # generation, z, x, y, decoded tile (null on failure)
+    jobFinished = pyqtSignal(object) # TileJob whose run() is done, see MapViewWidget._jobs
+
+
+class TileJob(QRunnable):
+    """Runs a blocking fetch of one or more tiles on a QThreadPool worker, reporting each through TileSignals."""
+    def __init__(self, fetch, generation, tiles, signals):
+        super().__init__()
+        self.fetch = fetch # Callable (tiles, job) -> list of QImage, null on failure or cancellation
+        self.prefetch = False # Queued on the prefetch pool rather than the visible-tile pool
+        self.cancelled = False # Set by the view once the tiles scrolled away; checked by the fetch
+        self.aborted = False # Set by the fetch when it skipped decoding because the job was cancelled
+        self.generation = generation # Lets the view drop tiles requested for a previous URL template
+        # Bound to the URL template at request time, so a job outliving set_tile_url still fetches and
+        # persists its tiles for the source it was requested from
+        self.tile_url = None # compile_tile_url builder
+        self.store = None # _MBTilesCache or None
+        self.tiles = tiles # [(z, x, y)], more than one only for batch requests
+        self.signals = signals
+        self.future = None # concurrent.futures.Future when run on an _AsyncTileFetcher instead of a pool
+
+    def run(self):
+        try:
+            try:
+                images = self.fetch(self.tiles, self)
+            except Exception:
+                # Still report every tile, otherwise they stay in flight and are never retried
+                logger.exception("Tile job %s failed", self.tiles)
+                images = [QImage() for _ in self.tiles]
+            for (z, x, y), image in zip(self.tiles, images):
+                self.signals.tileReady.emit(self.generation, z, x, y, image)
+        finally:
+            self.signals.jobFinished.emit(self)
+
+
+class _AsyncTileFetcher(QThread):
+    """Runs an asyncio event loop with one aiohttp session on its own thread.
+
+    Downloads only wait on sockets here, so up to TILE_ASYNC_CONNECTIONS tiles can be in flight
+    without a pool thread blocked on each. Coroutines are submitted from the GUI thread.
+    """
+    def __init__(self):
+        super().__init__()
+        self.loop = asyncio.new_event_loop()
+        self._session = None # aiohttp.ClientSession, created on the loop by the first download
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        # Stopped: drop pending downloads, then close the session on the loop it belongs to
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        if self._session is not None:
+            self.loop.run_until_complete(self._session.close())
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop, returns its concurrent.futures.Future. Thread-safe."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def get(self, url):
+        """Downloads url and returns the body. Raises aiohttp.ClientError or asyncio.TimeoutError."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=TILE_ASYNC_CONNECTIONS, limit_per_host=TILE_ASYNC_CONNECTIONS_PER_HOST),
+                headers={'User-Agent': 'GeoreferenceApp/0.1'},
+                timeout=aiohttp.ClientTimeout(total=TILE_REQUEST_TIMEOUT))
+        async with self._session.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    def stop(self):
+        """Stops the loop, cancelling downloads still pending, and waits for the thread."""
+        if self.isRunning():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.wait()
+
+
+# --- Image Loading ---
+class ImageLoaderSignals(QObject):
+    """Carries _ImageLoader results back to the GUI thread."""
+    loaded = pyqtSignal(int, object) # request id, decoded pixels (ndarray)
+    failed = pyqtSignal(int, str) # request id, error message
+
+
+class _ImageLoader(QRunnable):
+    """Decodes an image file into NumPy on a QThreadPool worker (large TIFFs take seconds)."""
+    def __init__(self, path, request_id, signals):
+        super().__init__()
+        self.path = path
+        self.request_id = request_id # Lets the view ignore a load superseded by a newer one
+        self.signals = signals
+
+    def run(self):
+        try:
+            with Image.open(self.path) as image:
+                pixels = image_to_array(image) # Decoded once into NumPy
+        except Exception as e: # An exception escaping run() would abort the process
+            # Pillow raises more than OSError for bad files (DecompressionBombError, struct.error, ...)
+            self.signals.failed.emit(self.request_id, str(e) or type(e).__name__)
+        else:
+            self.signals.loaded.emit(self.request_id, pixels)
+
+
+# --- GCP Table Model ---
+class GCPModel(QAbstractTableModel):
+    """Table model backed directly by the (N, 4) GCP array, the single source of truth for GCPs."""
+    HEADERS = ["Image X", "Image Y", "Map X (Lon)", "Map Y (Lat)"]
+    DECIMALS = [2, 2, 7, 7] # Displayed per column; 1e-7 degrees is about 1 cm
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._a = np.empty((0, 4), dtype=np.float64) # One row per GCP: img_x, img_y, map_x, map_y
+
+    def array(self):
+        """Returns the underlying GCP array (not a copy)."""
+        return self._a
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._a.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._a.shape[1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = float(self._a[index.row(), index.column()])
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{value:.{self.DECIMALS[index.column()]}f}"
+        if role == Qt.ItemDataRole.EditRole:
+            # Text rather than a float: Qt's default float editor would round to 2 decimals on commit
+            return repr(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return section + 1 # 1-based GCP number
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        if value == self._a[index.row(), index.column()]:
+            return True # Committed unchanged, no refit
+        self._a[index.row(), index.column()] = value
+        self.dataChanged.emit(index, index, [role]) # Only the edited cell changed
+        return True
+
+    def append_gcp(self, img_x, img_y, map_x, map_y):
+        """Appends one GCP row."""
+        row = self._a.shape[0]
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._a = np.concatenate([self._a, [[img_x, img_y, map_x, map_y]]])
+        self.endInsertRows()
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or count <= 0 or row + count > self._a.shape[0]:
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        self._a = np.delete(self._a, np.s_[row:row + count], axis=0)
+        self.endRemoveRows()
+        return True
 
 # Placeholder for a custom MapView widget
 class MapViewWidget(QWidget):
@@ -25,169 +766,718 @@ class MapViewWidget(QWidget):
         super().__init__(parent)
         self.setMinimumSize(600, 400)
         self.image_layer = None
+        self._image_np = None # Pixels behind image_layer (grayscale or RGBA), also the warp source
+        self._image_signals = ImageLoaderSignals() # No parent, see _tile_signals
+        self._image_signals.loaded.connect(self._on_image_loaded)
+        self._image_signals.failed.connect(self._on_image_failed)
+        self._image_request = 0 # Id of the most recent load_image call
         # Tile Layer Attributes
-        self.tile_layer = {} # Dictionary to store fetched tiles { (z,x,y): QImage }
+        self.tile_layer = _TileLRU(self._tile_capacity(600, 400)) # Fetched tiles by (z,x,y) in one atlas pixmap, resized with the view
         self.tile_url_template = None # e.g., "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+        self._tile_url = None # compile_tile_url(tile_url_template)
         self.tile_visible = True
-        self.requests_session = requests_cache.CachedSession() # Use cached session
-
-        self.gcps = []
+        self.batch_url_template = None # Optional batch endpoint, see set_batch_url
+        self.batch_max = TILE_BATCH_MAX
+        self._mbtiles = None # _MBTilesCache for the current URL template, checked before HTTP
+        self.requests_session = create_tile_session() # Use cached session, shared by all TileJobs
+        # Tiles are fetched and decoded on worker threads; paint only draws tiles that are already loaded
+        self._tile_pool = QThreadPool(self)
+        self._tile_pool.setMaxThreadCount(TILE_FETCH_THREADS)
+        self._tile_signals = TileSignals() # No parent: running jobs keep it alive if the view goes first
+        self._tile_signals.tileReady.connect(self._on_tile_ready)
+        self._prefetch_pool = QThreadPool(self)
+        self._prefetch_pool.setMaxThreadCount(TILE_PREFETCH_THREADS)
+        self._async_fetcher = None # _AsyncTileFetcher while async fetching is enabled, see set_async_fetch
+        self._inflight = {} # (z, x, y) -> TileJob, so each missing tile is requested once
+        # Every TileJob handed to a pool. With autoDelete off the Python wrapper owns the QRunnable, so it
+        # must outlive the pool's use of it: released once taken back or finished, never by _inflight
+        self._jobs = set()
+        self._tile_signals.jobFinished.connect(self._jobs.discard)
+        self._tile_failures = {} # (z, x, y) -> (retry_at, delay) for tiles whose last fetch failed
+        self._visible_tiles = None # (z, min_x, max_x, min_y, max_y) of the last composited view
+        app = QApplication.instance()
+        if app is not None: # Jobs reference this view, so the pools must drain before it is destroyed
+            app.aboutToQuit.connect(self.shutdown_tile_pools)
+        self._tile_generation = 0 # Bumped when the URL template changes
+
+        self.gcp_model = GCPModel(self) # Owns the GCP array, see the gcps property
+        # Marker outlines for all GCPs in one path: appended to as GCPs are added, rebuilt on edits
+        self._gcp_path = QPainterPath()
+        self._gcp_path.setFillRule(Qt.FillRule.WindingFill) # Overlapping markers stay filled
         self.preview_enabled = False
-        self.transformation = None
+        self.transformation = None # Image pixels -> map world pixels at zoom 0
+        self._inverse_transformation = None # Map world pixels at zoom 0 -> image pixels, drives the warp
+        self.selected_algorithm = "Polynomial (Order 1)"
+        self._tps = ThinPlateSplineTransform() # Kept across updates so its factorization can be reused
+        self._tps_inverse = ThinPlateSplineTransform()
+        self.gpu_enabled = False # Evaluate TPS warp maps on the GPU (requires CuPy)
+        self.rbf_support = 0.05 # Wendland RBF support (fraction of GCP extent), used above SPARSE_RBF_THRESHOLD
+        # Warped preview: source coordinates (float32) on a grid over the image footprint, upsampled
+        # to one output pixel per image pixel only while the preview image is being resampled
+        self._map_x, self._map_y = None, None
+        self._preview_bounds = None # Footprint in world pixels at zoom 0 (QRectF)
+        self._preview_image = None # Cached warped QImage, rebuilt when the maps change
+        self._preview_array = None # Keeps the pixel buffer behind _preview_image alive
+        # Maps are only sampled when the preview is drawn; a change just marks them stale
+        self._warp_maps_stale = True
+        self._warp_downsample = None # downsample for the next update_warp_maps, None: preview_downsample
+        self.preview_downsample = 4 # Maps are sampled on a grid this many times coarser than the image
+        self._gcps_dirty = True # Set whenever the GCPs or the algorithm change
+        # Recalculation is debounced so bursts of GCP edits coalesce into a single solve
+        self._recalc_timer = QTimer(self)
+        self._recalc_timer.setSingleShot(True)
+        self._recalc_timer.setInterval(30) # ms
+        self._recalc_timer.timeout.connect(self._do_update_transformation)
         # Map view state (basic example)
         self.zoom = 1 # Start at zoom level 1
         # Center point in *pixel* coordinates at the current zoom level
         # (0,0) corresponds to the top-left corner of the world map at this zoom
         self.center_pixel_x = TILE_SIZE / 2
         self.center_pixel_y = TILE_SIZE / 2
+        # World pixel at the widget's top-left; the whole screen <-> world mapping is this offset.
+        # Cached because every conversion needs it; call _invalidate_view after changing the center or size
+        self._view_origin_x, self._view_origin_y = 0.0, 0.0
+        self._invalidate_view()
         self._last_pan_pos = None # For mouse panning
+        # Backing store holding the composited tile and image layers; only re-rasterized when
+        # the layers or the view change, other paint events just blit it and draw the GCP overlay
+        self._composite = None
+        self._composite_dirty = True
+        # Tiles arriving from the pools are batched into at most one repaint per frame
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16) # ms, about one 60 Hz frame
+        self._repaint_timer.timeout.connect(self.update)
 
         # Set focus policy to accept keyboard events if needed, and mouse events
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.setMouseTracking(True) # Receive mouse move events even when no button is pressed
 
+        self.gcp_model.rowsInserted.connect(self._on_gcps_inserted)
+        for signal in (self.gcp_model.rowsRemoved, self.gcp_model.dataChanged, self.gcp_model.modelReset):
+            signal.connect(self._on_gcps_edited)
+
     def load_image(self, image_path):
-        print(f"Loading image: {image_path}")
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
-            print(f"Error: Failed to load image {image_path}")
-            self.image_layer = None
-            # Optionally show an error message to the user
-        else:
-            self.image_layer = pixmap
-            print(f"Image loaded successfully: {self.image_layer.size()}")
-            # TODO: Potentially reset view or fit image?
-        self.update() # Redraw
+        """Starts decoding the image on a worker thread; the layer is replaced once it is loaded."""
+        logger.debug("Loading image: %s", image_path)
+        self._image_request += 1
+        QThreadPool.globalInstance().start(_ImageLoader(image_path, self._image_request, self._image_signals))
+
+    def _on_image_loaded(self, request_id, pixels):
+        if request_id != self._image_request:
+            return # Superseded by a later load_image call
+        self._image_np = pixels
+        # QImage wraps the buffer here, on the GUI thread, which owns image_layer
+        self.image_layer = array_to_qimage(self._image_np) # Zero-copy view of self._image_np
+        logger.debug("Image loaded successfully: %s", self.image_layer.size())
+        # TODO: Potentially reset view or fit image?
+        self._invalidate_warp_maps()
+        self._invalidate_composite() # Redraw
+
+    def _on_image_failed(self, request_id, message):
+        if request_id != self._image_request:
+            return
+        logger.error("Failed to load image: %s", message)
+        self._image_np = self.image_layer = None
+        # Optionally show an error message to the user
+        self._invalidate_warp_maps()
+        self._invalidate_composite()
 
     def set_preview(self, enabled):
-        self.preview_enabled = enabled
-        print(f"Preview enabled: {enabled}")
-        self.update() # Redraw
+        if self.preview_enabled != enabled: # Checkboxes can re-emit their current state
+            self.preview_enabled = enabled
+            logger.debug("Preview enabled: %s", enabled)
+            self._invalidate_composite() # Redraw
 
     def add_gcp(self, img_pos: QPointF, map_pos: QPointF):
-         # TODO: Add GCP logic
-         print(f"Adding GCP: Image={img_pos}, Map={map_pos}")
-         self.gcps.append((img_pos, map_pos))
-         self.update_transformation() # Recalculate transformation
-         self.update() # Redraw
+         logger.debug("Adding GCP: Image=%s, Map=%s", img_pos, map_pos)
+         self.gcp_model.append_gcp(img_pos.x(), img_pos.y(), map_pos.x(), map_pos.y()) # Triggers _on_gcps_inserted
+
+    @property
+    def gcps(self):
+        """GCP array shared with the table model, one row per GCP: img_x, img_y, map_x (lon), map_y (lat)."""
+        return self.gcp_model.array()
+
+    def _on_gcps_inserted(self, parent, first, last):
+        """Appends markers for newly added GCPs to the marker path (drawing order doesn't matter)."""
+        self._add_gcp_markers(self.gcps[first:last + 1])
+        self._on_gcps_changed()
+
+    def _on_gcps_edited(self, *args):
+        """Rebuilds the marker path once after GCP edits or removals."""
+        self._rebuild_gcp_path()
+        self._on_gcps_changed()
+
+    def _add_gcp_markers(self, rows):
+        for x, y in rows[:, :2].tolist():
+            self._gcp_path.addEllipse(QPointF(x, y), 3, 3)
+
+    def _rebuild_gcp_path(self):
+        self._gcp_path.clear()
+        self._add_gcp_markers(self.gcps)
+
+    def _on_gcps_changed(self):
+        """Recalculates the transformation after any GCP insert, edit or removal."""
+        self._gcps_dirty = True
+        self.update_transformation() # Recalculate transformation
+        self.update() # Redraw the markers right away, the layers follow the recalculation
+
+    def set_algorithm(self, algorithm: str):
+        """Selects the transformation algorithm and recalculates the transformation."""
+        if self.selected_algorithm != algorithm:
+            self.selected_algorithm = algorithm
+            self._gcps_dirty = True
+            logger.debug("Transformation algorithm set to: %s", algorithm)
+            self.update_transformation()
 
     def update_transformation(self):
-        # TODO: Implement transformation calculation based on self.gcps and selected algorithm
-        print("Updating transformation...")
-        # Example using scikit-image (requires more setup)
-        # if len(self.gcps) >= 3: # Need enough points for transformation
-        #    src = np.array([[p[0].x(), p[0].y()] for p in self.gcps])
-        #    dst = np.array([[p[1].x(), p[1].y()] for p in self.gcps])
-        #    if self.selected_algorithm == "Polynomial":
-        #        self.transformation = PolynomialTransform()
-        #        self.transformation.estimate(src, dst)
-        #    # Add other algorithms (TPS, etc.)
-        pass
+        """Schedules a recalculation; repeated calls within the timer interval coalesce."""
+        self._recalc_timer.start()
+
+    def _do_update_transformation(self):
+        """Recalculates self.transformation (image -> map coordinates) from the GCPs."""
+        if not self._gcps_dirty:
+            return # Nothing changed since the last fit
+        self._gcps_dirty = False
+        logger.debug("Updating transformation...")
+        self.transformation = self._inverse_transformation = None
+        if len(self.gcps) >= 3: # Need enough points for transformation
+            # Map positions are (lon, lat); fit against Web Mercator world pixels at zoom 0
+            # so the warped preview only needs scaling to be drawn at any zoom level
+            src = self.gcps[:, :2] # Views into the GCP array, no per-point conversion
+            dst = np.column_stack(lonlat_to_world_pixels(self.gcps[:, 2], self.gcps[:, 3], 0))
+            self.transformation = self._estimate(src, dst, self._tps)
+            if self.transformation is not None:
+                self._inverse_transformation = self._estimate(dst, src, self._tps_inverse)
+        self._invalidate_warp_maps()
+        self._invalidate_composite() # Redraw
+
+    def set_rbf_support(self, support: float):
+        """Sets the sparse RBF support radius (fraction of the GCP extent) and recalculates."""
+        if self.rbf_support == support:
+            return
+        self.rbf_support = support
+        if self.selected_algorithm == "Thin Plate Spline" and len(self.gcps) > SPARSE_RBF_THRESHOLD:
+            self._gcps_dirty = True
+            self.update_transformation()
+
+    def _estimate(self, src, dst, tps):
+        """Estimates the selected algorithm from src to dst, returning None on failure."""
+        if self.selected_algorithm == "Thin Plate Spline" and len(src) > SPARSE_RBF_THRESHOLD:
+            # A dense TPS is O(N^3) to fit and O(N) per evaluated pixel; use local support instead
+            transformation = WendlandRBFTransform(self.rbf_support)
+            ok = transformation.estimate(src, dst)
+        elif self.selected_algorithm == "Thin Plate Spline":
+            transformation = tps
+            ok = transformation.estimate(src, dst)
+        else:
+            order = 2 if self.selected_algorithm == "Polynomial (Order 2)" else 1
+            transformation = PolynomialTransform()
+            ok = transformation.estimate(src, dst, order=order)
+        if not ok:
+            logger.warning("Failed to estimate %s transformation from %d GCPs", self.selected_algorithm, len(src))
+            return None
+        return transformation
+
+    def _invalidate_warp_maps(self, downsample=None):
+        """Drops the preview maps; they are sampled again the next time the preview is drawn."""
+        self._map_x, self._map_y = None, None
+        self._preview_bounds = self._preview_image = self._preview_array = None
+        self._warp_maps_stale = True
+        self._warp_downsample = downsample
+
+    def update_warp_maps(self, downsample=None):
+        """Samples the inverse transformation over the image footprint for the warped preview.
+
+        The transformation is evaluated on a grid `downsample` times coarser than the image
+        (default: self.preview_downsample); render_preview upsamples it bilinearly, which is
+        accurate enough for the smooth fields produced by the supported algorithms.
+        """
+        self._map_x, self._map_y = None, None
+        self._preview_bounds = self._preview_image = self._preview_array = None
+        self._warp_maps_stale = False
+        if self._image_np is None or self._inverse_transformation is None:
+            return
+
+        h, w = self._image_np.shape[:2]
+        # Footprint of the image on the map, from its transformed border
+        t = np.linspace(0.0, 1.0, 64)
+        border = np.concatenate([
+            np.column_stack([t * w, np.zeros_like(t)]), np.column_stack([t * w, np.full_like(t, h)]),
+            np.column_stack([np.zeros_like(t), t * h]), np.column_stack([np.full_like(t, w), t * h]),
+        ])
+        footprint = self.transformation(border)
+        (x0, y0), (x1, y1) = footprint.min(axis=0), footprint.max(axis=0)
+        if not (x1 > x0 and y1 > y0):
+            return
+
+        # One output pixel per source pixel over the footprint, evaluated on the coarse grid
+        factor = max(1, self.preview_downsample if downsample is None else downsample)
+        rows, cols = max(2, h // factor), max(2, w // factor)
+        grid_x, grid_y = np.meshgrid(np.linspace(x0, x1, cols), np.linspace(y0, y1, rows))
+        coords = self._inverse_transformation(np.column_stack([grid_x.ravel(), grid_y.ravel()]))
+        # float32 halves the bytes the warp streams through and is sub-pixel exact at image scales
+        self._map_x = coords[:, 0].reshape(rows, cols).astype(np.float32)
+        self._map_y = coords[:, 1].reshape(rows, cols).astype(np.float32)
+        self._preview_bounds = QRectF(x0, y0, x1 - x0, y1 - y0)
+
+    def set_gpu_enabled(self, enabled: bool):
+        """Switches TPS warp map evaluation between CPU and GPU (CuPy)."""
+        self.gpu_enabled = enabled and cupy is not None
+        self._tps.use_gpu = self._tps_inverse.use_gpu = self.gpu_enabled
+        logger.debug("GPU evaluation enabled: %s", self.gpu_enabled)
+
+    def render_full_resolution(self):
+        """Re-samples the preview maps at every pixel instead of the coarse preview grid."""
+        self._invalidate_warp_maps(downsample=1)
+        self._invalidate_composite() # Redraw
+
+    def render_preview(self):
+        """Returns the warped image as a QImage (None without a transformed image), built on first use."""
+        if self._warp_maps_stale:
+            self.update_warp_maps(self._warp_downsample)
+        if self._preview_image is None and self._map_x is not None:
+            source = self._image_np if self._image_np.ndim == 3 else self._image_np[..., None]
+            h, w = source.shape[:2]
+            map_x, map_y = self._map_x, self._map_y
+            if map_x.shape != (h, w): # Upsampling keeps the float32 dtype
+                # Corner-aligned bilinear upsampling, matching the linspace grid of update_warp_maps.
+                # Only the coarse maps stay resident; the full-size ones live for this resample
+                zoom = (h / map_x.shape[0], w / map_x.shape[1])
+                map_x = scipy.ndimage.zoom(map_x, zoom, order=1, grid_mode=False)
+                map_y = scipy.ndimage.zoom(map_y, zoom, order=1, grid_mode=False)
+            coords = np.stack([map_y, map_x])
+            warped = np.empty(map_x.shape + (4,), dtype=np.uint8)
+            for channel in range(source.shape[2]): # Pixels outside the image come out as 0
+                scipy.ndimage.map_coordinates(source[..., channel], coords, output=warped[..., channel], order=1, cval=0)
+            if source.shape[2] == 1: # Grayscale: replicate into RGB, outside the image is transparent
+                warped[..., 1] = warped[..., 2] = warped[..., 0]
+                inside = (map_x >= 0) & (map_x <= w - 1) & (map_y >= 0) & (map_y <= h - 1)
+                warped[..., 3] = np.where(inside, 255, 0)
+            self._preview_array = warped
+            self._preview_image = array_to_qimage(warped)
+        return self._preview_image
 
     def set_tile_url(self, url_template: str):
         """Sets the XYZ tile URL template."""
         if '{z}' in url_template and '{x}' in url_template and '{y}' in url_template:
             self.tile_url_template = url_template
+            self._tile_url = compile_tile_url(url_template)
+            self._open_mbtiles(url_template)
             self.tile_layer.clear() # Clear old tiles
-            self.update() # Redraw with new tiles
-            print(f"Tile URL set to: {url_template}")
+            for job in set(self._inflight.values()):
+                self._take_queued_job(job) # Running ones finish and are dropped by the generation check
+            self._inflight.clear()
+            self._tile_failures.clear()
+            self._tile_generation += 1 # Results of jobs still running for the old template are ignored
+            self._invalidate_composite() # Redraw with new tiles
+            logger.debug("Tile URL set to: %s", url_template)
         else:
-            print("Invalid tile URL template. Must contain {z}, {x}, {y}.")
-            self.tile_url_template = None
-            self.update()
+            logger.warning("Invalid tile URL template. Must contain {z}, {x}, {y}.")
+            self.tile_url_template = self._tile_url = None
+            self._invalidate_composite()
 
     def set_tile_visibility(self, visible: bool):
         """Sets the visibility of the tile layer."""
         if self.tile_visible != visible:
             self.tile_visible = visible
-            print(f"Tile visibility set to: {visible}")
-            self.update() # Redraw
+            logger.debug("Tile visibility set to: %s", visible)
+            self._invalidate_composite() # Redraw
 
     def set_cache_duration(self, days: int):
         """Sets the cache expiration duration in days."""
         if days >= 0:
             expire_after = days * 86400 # Convert days to seconds
-            # Reconfigure the cache session
-            requests_cache.install_cache('tile_cache', backend='sqlite', expire_after=expire_after)
-            self.requests_session = requests_cache.CachedSession() # Recreate session with new expiry
-            print(f"Tile cache duration set to {days} days.")
+            # Update the live session; recreating it would reopen the SQLite file under running jobs
+            self.requests_session.settings.expire_after = expire_after
+            logger.debug("Tile cache duration set to %d days.", days)
         else:
-            print("Cache duration must be non-negative.")
-
-
-    def fetch_tile(self, z, x, y):
-        """Fetches a single tile image, using cache if available."""
-        if not self.tile_url_template or not self.tile_visible:
+            logger.warning("Cache duration must be non-negative.")
+
+
+    def set_batch_url(self, url_template):
+        """Sets an endpoint fetching many tiles per request, or None to fetch tiles one by one.
+
+        Tiles are POSTed as a JSON list of {"z", "x", "y"} objects ({z} in the template is filled in,
+        all tiles of a batch share the zoom); the response is the same list with the encoded image
+        bytes added to each object as base64 "data". Batch responses bypass the HTTP cache.
+        """
+        self.batch_url_template = url_template or None
+        logger.debug("Tile batch URL set to: %s", self.batch_url_template)
+
+    def set_async_fetch(self, enabled):
+        """Downloads tiles with aiohttp on an asyncio event loop instead of the blocking pools (requires aiohttp).
+
+        Many more downloads can wait on the network at once, see TILE_ASYNC_CONNECTIONS. Responses
+        bypass the HTTP cache, tiles still persist in the MBTiles store; batch requests keep using the pools.
+        """
+        enabled = enabled and aiohttp is not None
+        if enabled == (self._async_fetcher is not None):
+            return
+        if enabled:
+            self._async_fetcher = _AsyncTileFetcher()
+            self._async_fetcher.start()
+        else:
+            fetcher, self._async_fetcher = self._async_fetcher, None
+            fetcher.stop()
+            # Its pending jobs were cancelled without reporting; forget them so the tiles are requested again
+            for key, job in list(self._inflight.items()):
+                if job.future is not None:
+                    del self._inflight[key]
+            self._schedule_repaint()
+        logger.debug("Async tile fetching set to: %s", enabled)
+
+    def _request_tiles(self, tiles, prefetch=False):
+        """Queues TileJobs for the (z, x, y) tiles that are not already in flight."""
+        new = []
+        for key in tiles:
+            job = self._inflight.get(key)
+            if job is None:
+                failure = self._tile_failures.get(key)
+                if failure is None or time.monotonic() >= failure[0]: # Repaints must not hammer a failing tile
+                    new.append(key)
+            elif job.cancelled:
+                job.cancelled = False # Back in view while still running; keep its result after all
+            elif job.prefetch and not prefetch and self._prefetch_pool.tryTake(job):
+                # Prefetched tile came into view before its turn: move it to the visible lane
+                job.prefetch = False
+                self._tile_pool.start(job)
+        batch = self.batch_max if self.batch_url_template else 1
+        for start in range(0, len(new), batch):
+            job = TileJob(self._fetch_tiles, self._tile_generation, new[start:start + batch], self._tile_signals)
+            job.setAutoDelete(False) # Owned by _inflight, so a queued job can still be taken back
+            job.prefetch = prefetch
+            job.tile_url, job.store = self._tile_url, self._mbtiles
+            for key in job.tiles:
+                self._inflight[key] = job
+            if self._async_fetcher is not None and len(job.tiles) == 1:
+                # No queue to take jobs back from: cancelled ones are skipped by _fetch_tile_async
+                job.future = self._async_fetcher.submit(self._run_tile_job_async(job, self._async_fetcher))
+            else:
+                self._jobs.add(job)
+                (self._prefetch_pool if prefetch else self._tile_pool).start(job)
+
+    def _cancel_tiles_outside(self, z, min_x, max_x, min_y, max_y):
+        """Cancels in-flight jobs whose tiles are all outside the given range and its prefetch ring."""
+        for job in set(self._inflight.values()):
+            if any(tz == z and min_x - 1 <= tx <= max_x + 1 and min_y - 1 <= ty <= max_y + 1
+                   for tz, tx, ty in job.tiles):
+                continue
+            if self._take_queued_job(job):
+                for key in job.tiles: # Still queued, never started
+                    self._inflight.pop(key, None)
+            else:
+                job.cancelled = True # Already running; its results are dropped on arrival
+
+    def _take_queued_job(self, job):
+        """Takes a job back from its pool if it has not started yet. Returns True if it was taken."""
+        if (self._prefetch_pool if job.prefetch else self._tile_pool).tryTake(job):
+            self._jobs.discard(job)
+            return True
+        return False
+
+    def _prefetch_tiles(self, tiles):
+        """Queues tiles on the low-priority prefetch lane, skipping invalid, loaded or in-flight ones."""
+        self._request_tiles([
+            (z, x, y) for z, x, y in tiles
+            if 0 <= x < 2 ** z and 0 <= y < 2 ** z and (z, x, y) not in self.tile_layer
+        ], prefetch=True)
+
+    def shutdown_tile_pools(self):
+        """Drops queued tile jobs and waits for the running ones to finish."""
+        if self._async_fetcher is not None:
+            self._async_fetcher.stop()
+            self._async_fetcher = None
+        for pool in (self._tile_pool, self._prefetch_pool):
+            pool.clear()
+        for pool in (self._tile_pool, self._prefetch_pool):
+            pool.waitForDone()
+        self._inflight.clear()
+        self._jobs.clear() # Pools are drained, nothing runs them any more
+        self._open_mbtiles(None) # Flush pending MBTiles writes
+
+    def _open_mbtiles(self, url_template):
+        """Switches the persistent tile store to the one for url_template (None closes it)."""
+        if self._mbtiles is not None:
+            self._mbtiles.close()
+            self._mbtiles = None
+        if url_template:
+            # One file per tile source, named by a hash of the template
+            name = hashlib.sha1(url_template.encode()).hexdigest()[:12]
+            try:
+                self._mbtiles = _MBTilesCache(f"tiles_{name}.mbtiles")
+            except sqlite3.Error as e:
+                logger.warning("Could not open MBTiles cache, tiles will not persist: %s", e)
+
+    def _tile_max_age(self):
+        """Maximum age in seconds of persisted tiles, following the HTTP cache expiry (None: never expire)."""
+        expire_after = self.requests_session.settings.expire_after
+        if expire_after is None or (isinstance(expire_after, (int, float)) and expire_after < 0):
             return None
-        if (z, x, y) in self.tile_layer:
-            return self.tile_layer[(z, x, y)]
+        return expire_after.total_seconds() if hasattr(expire_after, 'total_seconds') else expire_after
+
+    def _fetch_tiles(self, tiles, job):
+        """Loads a TileJob's tiles from the MBTiles store, downloading the rest. Runs on a pool thread."""
+        images, remote = self._load_stored_tiles(job)
+        if remote:
+            wanted = [tiles[i] for i in remote]
+            if len(wanted) > 1:
+                downloads = self._fetch_tile_batch(wanted, job) # Only when a batch endpoint is set
+            else:
+                downloads = [self._fetch_tile_blocking(*wanted[0], job)]
+            self._decode_downloads(job, images, remote, downloads)
+        return images
 
-        url = self.tile_url_template.format(z=z, x=x, y=y)
+    async def _run_tile_job_async(self, job, fetcher):
+        """TileJob.run on an _AsyncTileFetcher loop; store lookups and decoding go to the loop's executor."""
+        loop = asyncio.get_running_loop()
+        try:
+            images, remote = await loop.run_in_executor(None, self._load_stored_tiles, job)
+            if remote:
+                downloads = await asyncio.gather(*(self._fetch_tile_async(fetcher, *job.tiles[i], job) for i in remote))
+                await loop.run_in_executor(None, self._decode_downloads, job, images, remote, downloads)
+        except Exception:
+            logger.exception("Tile job %s failed", job.tiles) # Reported as failures below, as in TileJob.run
+            images = [QImage() for _ in job.tiles]
+        for (z, x, y), image in zip(job.tiles, images):
+            job.signals.tileReady.emit(job.generation, z, x, y, image)
+
+    def _load_stored_tiles(self, job):
+        """Decodes the job's tiles found in its MBTiles store. Returns the images and the indices still to download."""
+        tiles, store, max_age = job.tiles, job.store, self._tile_max_age()
+        images = [QImage() for _ in tiles]
+        remote = [] # Indices of tiles that are not stored (or no longer decode)
+        for i, (z, x, y) in enumerate(tiles):
+            data = store.get(z, x, y, max_age) if store is not None else None
+            if data is not None:
+                images[i] = self._decode_tile(data, z, x, y)
+            if images[i].isNull():
+                remote.append(i)
+        return images, remote
+
+    def _decode_downloads(self, job, images, remote, downloads):
+        """Decodes downloaded bytes into images[remote[i]] and persists the tiles that decode in the job's store."""
+        tiles, store = job.tiles, job.store
+        for i, data in zip(remote, downloads):
+            if data is not None:
+                z, x, y = tiles[i]
+                images[i] = self._decode_tile(data, z, x, y)
+                if store is not None and not images[i].isNull():
+                    store.put(z, x, y, data)
+
+    def _fetch_tile_blocking(self, z, x, y, job):
+        """Downloads (or reads from the HTTP cache) one tile's encoded bytes, None on failure. Runs on a pool thread."""
+        url = job.tile_url(z, x, y)
         try:
             # Use the cached session
-            response = self.requests_session.get(url, headers={'User-Agent': 'GeoreferenceApp/0.1'}) # Add User-Agent
+            response = self.requests_session.get(
+                url, headers={'User-Agent': 'GeoreferenceApp/0.1'}, timeout=TILE_REQUEST_TIMEOUT) # Add User-Agent
             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            if job.cancelled:
+                job.aborted = True
+                return None # Left the view while downloading; the response is cached, skip the decode
+            if not getattr(response, 'from_cache', False):
+                logger.debug("Fetched tile (Not Cached): %s/%s/%s", z, x, y)
+            return response.content
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error fetching tile %s/%s/%s: %s", z, x, y, e)
+        except Exception as e:
+            logger.warning("Error processing tile %s/%s/%s: %s", z, x, y, e)
+        return None
 
-            # Check if the response came from cache
-            was_cached = getattr(response, 'from_cache', False)
-            if not was_cached:
-                print(f"Fetched tile (Not Cached): {z}/{x}/{y}")
-            # else:
-            #     print(f"Fetched tile (Cached): {z}/{x}/{y}")
-
+    async def _fetch_tile_async(self, fetcher, z, x, y, job):
+        """Downloads one tile's encoded bytes on the fetcher's loop, None on failure or cancellation."""
+        if job.cancelled:
+            job.aborted = True # Scrolled away before its download started
+            return None
+        try:
+            data = await fetcher.get(job.tile_url(z, x, y))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Error fetching tile %s/%s/%s: %s", z, x, y, e)
+            return None
+        if job.cancelled:
+            job.aborted = True
+            return None
+        logger.debug("Fetched tile (async): %s/%s/%s", z, x, y)
+        return data
 
-            image = QImage()
-            image.loadFromData(response.content)
-            if not image.isNull():
-                self.tile_layer[(z, x, y)] = image
-                return image
-            else:
-                print(f"Failed to load image data for tile: {z}/{x}/{y}")
-                return None
+    def _fetch_tile_batch(self, tiles, job=None):
+        """Downloads tiles of one zoom level in a single POST to the batch endpoint. Runs on a pool thread.
 
+        Returns the encoded bytes per tile, None for tiles that failed.
+        """
+        z = tiles[0][0]
+        url = self.batch_url_template.replace('{z}', str(z))
+        try:
+            response = self.requests_session.post(
+                url, json=[{"z": tz, "x": tx, "y": ty} for tz, tx, ty in tiles],
+                headers={'User-Agent': 'GeoreferenceApp/0.1'}, timeout=TILE_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            if job is not None and job.cancelled:
+                job.aborted = True
+                return [None] * len(tiles)
+            logger.debug("Fetched batch of %d tiles at zoom %s", len(tiles), z)
+            data = {(t["z"], t["x"], t["y"]): t.get("data") for t in response.json()}
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching tile {z}/{x}/{y}: {e}")
-            # Optionally cache a 'failed' tile marker?
-            return None
-        except Exception as e:
-            print(f"Error processing tile {z}/{x}/{y}: {e}")
-            return None
+            logger.warning("Error fetching tile batch at zoom %s: %s", z, e)
+            return [None] * len(tiles)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning("Malformed tile batch response at zoom %s: %s", z, e)
+            return [None] * len(tiles)
+        downloads = []
+        for tz, tx, ty in tiles:
+            encoded = data.get((tz, tx, ty))
+            if encoded is None:
+                logger.warning("Tile %s/%s/%s missing from batch response", tz, tx, ty)
+                downloads.append(None)
+                continue
+            try:
+                downloads.append(base64.b64decode(encoded))
+            except (TypeError, ValueError) as e: # binascii.Error is a ValueError
+                logger.warning("Malformed data for tile %s/%s/%s in batch response: %s", tz, tx, ty, e)
+                downloads.append(None)
+        return downloads
+
+    @staticmethod
+    def _decode_tile(data, z, x, y):
+        """Decodes encoded tile bytes into a QImage (null on failure). Safe off the GUI thread."""
+        image = QImage() # Unlike QPixmap, QImage may be created and decoded outside the GUI thread
+        if image.loadFromData(data):
+            if image.format() in NATIVE_TILE_FORMATS:
+                return image # Opaque JPEG/PNG tiles decode to RGB32, already blitted without conversion
+            # Convert to the painter's native format here, off the GUI thread, so neither the
+            # pixmap upload nor any later blit has to convert the decoded (often indexed) PNG
+            return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        logger.warning("Failed to load image data for tile: %s/%s/%s", z, x, y)
+        return image
+
+    def _on_tile_ready(self, generation, z, x, y, image):
+        """Stores a tile decoded by a TileJob and repaints if it is visible."""
+        if generation != self._tile_generation:
+            return # Requested for a previous URL template
+        job = self._inflight.pop((z, x, y), None)
+        if job is None or job.cancelled:
+            return # Cancelled while running, no longer wanted
+        if job.aborted:
+            # Un-cancelled after the fetch had already skipped the decode: not a failure, request it again
+            self._schedule_repaint()
+            return
+        if image.isNull():
+            # Error already logged; retried by a later repaint once the backoff has passed
+            _, delay = self._tile_failures.get((z, x, y), (None, TILE_RETRY_DELAY / 2))
+            delay = min(delay * 2, TILE_RETRY_MAX_DELAY)
+            self._tile_failures[(z, x, y)] = (time.monotonic() + delay, delay)
+            return
+        self._tile_failures.pop((z, x, y), None)
+        self.tile_layer.put((z, x, y), image) # Copied into the atlas pixmap, which lives on the GUI thread
+        if self._visible_tiles is not None:
+            vz, min_x, max_x, min_y, max_y = self._visible_tiles
+            if z == vz and min_x <= x <= max_x and min_y <= y <= max_y:
+                self._schedule_repaint() # Prefetched tiles outside the view need no repaint
 
     # --- Coordinate Conversion Helpers ---
     def world_pixels_to_tile_coords(self, px, py, zoom):
         """Converts world pixel coordinates at a given zoom to tile coordinates (z, x, y)."""
         # Total pixels in the world map at this zoom level
         # map_size_pixels = TILE_SIZE * (2 ** zoom)
-        tile_x = math.floor(px / TILE_SIZE)
-        tile_y = math.floor(py / TILE_SIZE)
-        return zoom, tile_x, tile_y
+        # Float floor division floors toward -inf like math.floor (int(px) >> 8 would not for px < 0)
+        return zoom, int(px // TILE_SIZE), int(py // TILE_SIZE)
+
+    def _invalidate_view(self):
+        """Recomputes the cached view origin after a pan, zoom or resize."""
+        self._view_origin_x = self.center_pixel_x - self.width() / 2
+        self._view_origin_y = self.center_pixel_y - self.height() / 2
 
     def screen_to_world_pixels(self, screen_pos: QPointF):
         """Converts screen pixel coordinates (relative to widget) to world pixel coordinates."""
-        # Calculate the top-left world pixel coordinate visible in the widget
-        view_width = self.width()
-        view_height = self.height()
-        top_left_world_x = self.center_pixel_x - view_width / 2
-        top_left_world_y = self.center_pixel_y - view_height / 2
-
-        world_x = top_left_world_x + screen_pos.x()
-        world_y = top_left_world_y + screen_pos.y()
-        return QPointF(world_x, world_y)
+        return QPointF(screen_pos.x() + self._view_origin_x, screen_pos.y() + self._view_origin_y)
 
     def world_to_screen_pixels(self, world_pos: QPointF):
         """Converts world pixel coordinates to screen pixel coordinates (relative to widget)."""
-        view_width = self.width()
-        view_height = self.height()
-        top_left_world_x = self.center_pixel_x - view_width / 2
-        top_left_world_y = self.center_pixel_y - view_height / 2
-
-        screen_x = world_pos.x() - top_left_world_x
-        screen_y = world_pos.y() - top_left_world_y
-        return QPointF(screen_x, screen_y)
+        return QPointF(world_pos.x() - self._view_origin_x, world_pos.y() - self._view_origin_y)
 
     # --- Painting Logic ---
+    def _invalidate_composite(self):
+        """Marks the layer backing store stale and schedules a repaint."""
+        self._composite_dirty = True
+        self.update()
+
+    @staticmethod
+    def _tile_capacity(width, height):
+        """Tiles kept in memory: a viewport's worth plus a border, for about 3 zoom levels."""
+        return math.ceil(width / TILE_SIZE + 2) * math.ceil(height / TILE_SIZE + 2) * 3
+
+    def _placeholder_fragments(self, missing, top_left_world):
+        """Atlas fragments standing in for missing tiles with loaded tiles of the adjacent zoom levels.
+
+        A missing tile shows its quadrant of the parent tile scaled up, covered by whichever of its
+        four children are loaded, scaled down. Pure reuse of the LRU, nothing is requested.
+        """
+        fragments, children = [], []
+        half, quarter = TILE_SIZE / 2, TILE_SIZE / 4
+        slot, cell = self.tile_layer.slot, self.tile_layer.cell
+        for z, x, y in missing:
+            center_x = x * TILE_SIZE - top_left_world.x() + half
+            center_y = y * TILE_SIZE - top_left_world.y() + half
+            parent = slot((z - 1, x // 2, y // 2)) if z > 0 else None
+            if parent is not None:
+                source = cell(parent)
+                source = QRectF(source.x() + (x % 2) * half, source.y() + (y % 2) * half, half, half)
+                fragments.append(QPainter.PixmapFragment.create(QPointF(center_x, center_y), source, 2, 2))
+            for dx in (0, 1):
+                for dy in (0, 1):
+                    child = slot((z + 1, 2 * x + dx, 2 * y + dy))
+                    if child is not None:
+                        children.append(QPainter.PixmapFragment.create(
+                            QPointF(center_x + (2 * dx - 1) * quarter, center_y + (2 * dy - 1) * quarter),
+                            cell(child), 0.5, 0.5))
+        return fragments + children # Sharper children drawn over the parent
+
+    def _schedule_repaint(self):
+        """Like _invalidate_composite, but coalesces calls within a frame into a single repaint."""
+        self._composite_dirty = True
+        if not self._repaint_timer.isActive(): # Already-pending repaint will pick this change up
+            self._repaint_timer.start()
+
+    def resizeEvent(self, event):
+        self._composite = None # Recreated at the new size on the next paint
+        self.tile_layer.capacity = self._tile_capacity(event.size().width(), event.size().height())
+        self.tile_layer.trim()
+        super().resizeEvent(event)
+        self._invalidate_view() # After the base class, so width()/height() report the new size
+
     def paintEvent(self, event):
+        if self._composite is None:
+            self._composite = QImage(self.size(), QImage.Format.Format_ARGB32_Premultiplied)
+            self._composite_dirty = True
+        if self._composite_dirty:
+            self._render_composite()
+
         painter = QPainter(self)
+        # Markers are tiny and axis-aligned; antialiasing would roughly double their draw cost
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        painter.drawImage(0, 0, self._composite)
+
+        # --- Draw GCP Markers ---
+        # TODO: Adjust image positions based on image layer's current transformation (zoom/pan)
+        # For now, draw relative to the fixed image position (0,0)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(Qt.GlobalColor.red)
+        painter.drawPath(self._gcp_path) # All markers rasterized as one path
+
+        # TODO: Convert map positions (map coordinates - lat/lon or projected) to world pixels
+        # This requires a projection conversion (e.g., Mercator for standard web maps)
+        # Then convert world pixels to screen pixels.
+        # world_gcp_pos = self.map_coords_to_world_pixels(map_pos, self.zoom)
+        # screen_gcp_pos = self.world_to_screen_pixels(world_gcp_pos)
+        # painter.drawEllipse(screen_gcp_pos, 3, 3)
+
+        painter.end()
+
+    def _render_composite(self):
+        """Rasterizes the tile and image layers into the backing store."""
+        painter = QPainter(self._composite)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False) # Only axis-aligned fills and blits here
         painter.fillRect(self.rect(), Qt.GlobalColor.darkGray) # Background
         view_rect = self.rect() # The rectangle of the widget area
 
@@ -202,25 +1492,41 @@ class MapViewWidget(QWidget):
             _, min_tile_x, min_tile_y = self.world_pixels_to_tile_coords(top_left_world.x(), top_left_world.y(), z)
             _, max_tile_x, max_tile_y = self.world_pixels_to_tile_coords(bottom_right_world.x(), bottom_right_world.y(), z)
 
-            # Fetch and draw the required tiles
-            for tile_x in range(min_tile_x, max_tile_x + 1):
-                for tile_y in range(min_tile_y, max_tile_y + 1):
-                    tile_image = self.fetch_tile(z, tile_x, tile_y)
-                    if tile_image:
-                        # Calculate the top-left world pixel coordinate of this tile
-                        tile_world_x = tile_x * TILE_SIZE
-                        tile_world_y = tile_y * TILE_SIZE
-                        # Convert tile's world position to screen position
-                        screen_pos = self.world_to_screen_pixels(QPointF(tile_world_x, tile_world_y))
-                        # Draw the tile
-                        painter.drawImage(screen_pos, tile_image)
-                    # else: # Optionally draw a placeholder for missing tiles
-                    #     tile_world_x = tile_x * TILE_SIZE
-                    #     tile_world_y = tile_y * TILE_SIZE
-                    #     screen_pos = self.world_to_screen_pixels(QPointF(tile_world_x, tile_world_y))
-                    #     painter.setPen(Qt.GlobalColor.red)
-                    #     painter.drawRect(QRectF(screen_pos.x(), screen_pos.y(), TILE_SIZE, TILE_SIZE))
-                    #     painter.drawText(QRectF(screen_pos.x(), screen_pos.y(), TILE_SIZE, TILE_SIZE), Qt.AlignmentFlag.AlignCenter, f"{z}/{tile_x}/{tile_y}")
+            # Tiles requested for an earlier view would otherwise hold pool threads the current view needs
+            self._cancel_tiles_outside(z, min_tile_x, max_tile_x, min_tile_y, max_tile_y)
+
+            tile_xs, tile_ys, slots = self.tile_layer.visible(z, min_tile_x, max_tile_x, min_tile_y, max_tile_y)
+            loaded = np.zeros((max_tile_y - min_tile_y + 1, max_tile_x - min_tile_x + 1), dtype=bool)
+            loaded[tile_ys - min_tile_y, tile_xs - min_tile_x] = True
+            missing_ys, missing_xs = np.nonzero(~loaded)
+            missing = [(z, tile_x, tile_y) for tile_x, tile_y in zip(
+                (missing_xs + min_tile_x).tolist(), (missing_ys + min_tile_y).tolist())]
+
+            # Draw the tiles in memory in one call, each as a fragment of the tile atlas, after
+            # scaled placeholders for the missing ones. Fragments are positioned by their center
+            # (tile world position minus view origin)
+            half = TILE_SIZE / 2
+            cell = self.tile_layer.cell
+            fragments = self._placeholder_fragments(missing, top_left_world)
+            centers_x = (tile_xs * TILE_SIZE - top_left_world.x() + half).tolist()
+            centers_y = (tile_ys * TILE_SIZE - top_left_world.y() + half).tolist()
+            fragments += [
+                QPainter.PixmapFragment.create(QPointF(center_x, center_y), cell(slot))
+                for center_x, center_y, slot in zip(centers_x, centers_y, slots.tolist())
+            ]
+            if fragments:
+                painter.drawPixmapFragments(fragments, self.tile_layer.atlas)
+
+            # Queue every other tile of the range so the misses download concurrently
+            self._request_tiles(missing)
+            self._visible_tiles = (z, min_tile_x, max_tile_x, min_tile_y, max_tile_y)
+
+            # Warm a 1-tile ring around the view so a pan reveals tiles that are already loaded
+            ring = [(z, tile_x, tile_y) for tile_x in range(min_tile_x - 1, max_tile_x + 2)
+                    for tile_y in (min_tile_y - 1, max_tile_y + 1)]
+            ring += [(z, tile_x, tile_y) for tile_y in range(min_tile_y, max_tile_y + 1)
+                     for tile_x in (min_tile_x - 1, max_tile_x + 1)]
+            self._prefetch_tiles(ring)
 
         # --- Draw Image Layer ---
         if self.image_layer:
@@ -228,33 +1534,22 @@ class MapViewWidget(QWidget):
             # This requires mapping image coordinates to the same world coordinate system
             # or applying a separate transformation based on view state.
             # For now, just draw it at the top-left, untransformed.
-            if self.preview_enabled and self.transformation:
-                 print("Drawing preview (not implemented)")
-                 # Placeholder: draw original image slightly offset
-                 painter.drawPixmap(10, 10, self.image_layer)
+            preview = self.render_preview() if self.preview_enabled else None
+            if preview is not None:
+                 # Warped image placed over its footprint, scaled from zoom 0 to the current zoom
+                 scale = 2 ** self.zoom
+                 bounds = self._preview_bounds
+                 top_left = self.world_to_screen_pixels(QPointF(bounds.left() * scale, bounds.top() * scale))
+                 target = QRectF(top_left.x(), top_left.y(), bounds.width() * scale, bounds.height() * scale)
+                 painter.drawImage(target, preview)
             else:
                 # Draw image at a fixed screen position (e.g., top-left) for now
                 # Ideally, this should also be positioned based on self.center_pixel_x/y and self.zoom
                 # or based on the georeferencing transformation.
-                painter.drawPixmap(0, 0, self.image_layer)
-
-        # --- Draw GCP Markers ---
-        painter.setPen(Qt.GlobalColor.red)
-        painter.setBrush(Qt.GlobalColor.red)
-        for img_pos, map_pos in self.gcps:
-             # TODO: Adjust img_pos based on image layer's current transformation (zoom/pan)
-             # For now, draw relative to the fixed image position (0,0)
-             screen_img_pos = img_pos # Assuming image is drawn at 0,0
-             painter.drawEllipse(screen_img_pos, 3, 3)
-
-             # TODO: Convert map_pos (map coordinates - lat/lon or projected) to world pixels
-             # This requires a projection conversion (e.g., Mercator for standard web maps)
-             # Then convert world pixels to screen pixels.
-             # world_gcp_pos = self.map_coords_to_world_pixels(map_pos, self.zoom)
-             # screen_gcp_pos = self.world_to_screen_pixels(world_gcp_pos)
-             # painter.drawEllipse(screen_gcp_pos, 3, 3)
+                painter.drawImage(0, 0, self.image_layer)
 
         painter.end()
+        self._composite_dirty = False
 
     # --- Mouse Event Handlers ---
     def mousePressEvent(self, event):
@@ -273,12 +1568,13 @@ class MapViewWidget(QWidget):
             # Pan the map by adjusting the center pixel coordinates
             self.center_pixel_x -= delta.x()
             self.center_pixel_y -= delta.y()
-            self.update() # Trigger redraw
+            self._invalidate_view()
+            self._invalidate_composite() # Trigger redraw
             event.accept()
         else:
             # TODO: Show coordinates in status bar?
             # world_pos = self.screen_to_world_pixels(event.position())
-            # print(f"Mouse World Pos: {world_pos.x():.2f}, {world_pos.y():.2f} | Zoom: {self.zoom}")
+            # logger.debug("Mouse World Pos: %.2f, %.2f | Zoom: %d", world_pos.x(), world_pos.y(), self.zoom)
             super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
@@ -324,10 +1620,10 @@ class MapViewWidget(QWidget):
 
             self.center_pixel_x = new_center_x
             self.center_pixel_y = new_center_y
+            self._invalidate_view()
 
-            # Clear existing tile images as they are for the wrong zoom level
-            # self.tile_layer.clear() # Keep tiles for potential reuse if panning back?
-            self.update() # Trigger redraw
+            # Tiles of the previous zoom stay cached: they are drawn scaled until the new level loads
+            self._invalidate_composite() # Trigger redraw
 
         event.accept()
 
@@ -410,6 +1706,12 @@ class GeoreferenceApp(QMainWindow):
         cache_layout.addStretch()
         tile_layout.addLayout(cache_layout)
 
+        self.async_fetch_cb = QCheckBox("Async Fetching")
+        self.async_fetch_cb.setEnabled(aiohttp is not None)
+        self.async_fetch_cb.setToolTip(
+            "Download tiles on an asyncio event loop" if aiohttp is not None else "Requires aiohttp")
+        tile_layout.addWidget(self.async_fetch_cb)
+
         apply_tile_settings_button = QPushButton("Apply Tile Settings")
         tile_layout.addWidget(apply_tile_settings_button)
 
@@ -432,6 +1734,9 @@ class GeoreferenceApp(QMainWindow):
             lambda state: self.map_view.set_tile_visibility(state == Qt.CheckState.Checked.value)
         )
         apply_tile_settings_button.clicked.connect(self.apply_tile_settings)
+        self.async_fetch_cb.stateChanged.connect(
+            lambda state: self.map_view.set_async_fetch(state == Qt.CheckState.Checked.value)
+        )
         # TODO: Connect opacity sliders when implemented
 
     def create_gcp_dock(self):
@@ -441,8 +1746,8 @@ class GeoreferenceApp(QMainWindow):
         gcp_widget = QWidget()
         layout = QVBoxLayout(gcp_widget)
 
-        # TODO: Replace with QTableView and a model (QAbstractTableModel)
         self.gcp_table = QTableView()
+        self.gcp_table.setModel(self.map_view.gcp_model)
         layout.addWidget(self.gcp_table)
 
         input_layout = QHBoxLayout()
@@ -481,8 +1786,27 @@ class GeoreferenceApp(QMainWindow):
         layout.addWidget(weighting_label)
         layout.addWidget(self.weighting_combo)
 
+        support_layout = QHBoxLayout()
+        support_layout.addWidget(QLabel(f"RBF Support (TPS > {SPARSE_RBF_THRESHOLD} GCPs):"))
+        self.rbf_support_spin = QDoubleSpinBox()
+        self.rbf_support_spin.setRange(0.01, 1.0) # Fraction of the GCP extent
+        self.rbf_support_spin.setSingleStep(0.01)
+        self.rbf_support_spin.setValue(self.map_view.rbf_support)
+        support_layout.addWidget(self.rbf_support_spin)
+        layout.addLayout(support_layout)
+
+        preview_layout = QHBoxLayout()
         self.preview_cb = QCheckBox("Real-time Preview")
-        layout.addWidget(self.preview_cb)
+        preview_layout.addWidget(self.preview_cb)
+        self.gpu_cb = QCheckBox("GPU")
+        self.gpu_cb.setEnabled(cupy is not None)
+        self.gpu_cb.setToolTip("Evaluate the Thin Plate Spline on the GPU" if cupy is not None else "Requires CuPy")
+        preview_layout.addWidget(self.gpu_cb)
+        preview_layout.addStretch()
+        layout.addLayout(preview_layout)
+
+        render_button = QPushButton("Render Full Resolution")
+        layout.addWidget(render_button)
 
         layout.addStretch()
         dock.setWidget(transform_widget)
@@ -490,7 +1814,11 @@ class GeoreferenceApp(QMainWindow):
 
         # Connect signals
         self.preview_cb.stateChanged.connect(lambda state: self.map_view.set_preview(state == Qt.CheckState.Checked.value))
-        # TODO: Connect algorithm/weighting changes to update transformation
+        self.algo_combo.currentTextChanged.connect(self.map_view.set_algorithm)
+        self.gpu_cb.stateChanged.connect(lambda state: self.map_view.set_gpu_enabled(state == Qt.CheckState.Checked.value))
+        render_button.clicked.connect(self.map_view.render_full_resolution)
+        self.rbf_support_spin.valueChanged.connect(self.map_view.set_rbf_support)
+        # TODO: Connect weighting changes to update transformation
 
     def apply_tile_settings(self):
         """Applies the URL and cache duration from the UI to the MapViewWidget."""
@@ -507,7 +1835,7 @@ class GeoreferenceApp(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", "Images (*.png *.jpg *.bmp *.tif *.tiff)")
         if file_path:
            self.map_view.load_image(file_path)
-           self.status_bar.showMessage(f"Image loaded: {file_path}", 5000)
+           self.status_bar.showMessage(f"Loading image: {file_path}", 5000)
         # print("Open image action triggered (implement file dialog)")
         # Example: Load a dummy path
         # self.map_view.load_image("path/to/your/image.tif")
@@ -515,6 +1843,7 @@ class GeoreferenceApp(QMainWindow):
 
 if __name__ == '__main__':
     # Ensure QApplication is created before any QWidgets
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
     app = QApplication(sys.argv)
     main_window = GeoreferenceApp()
     main_window.show()